@@ -1,70 +1,325 @@
 import tempfile
 import os
+import copy
+import hashlib
+import re
 import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from act import ExecutionManager
+from act.actfile_parser import ActfileParser, ActfileParserError
+from act.workflow_engine import WorkflowEngine
+from pathlib import Path
+from datetime import datetime
 import logging
 from typing import Dict, Any
+from collections import OrderedDict
 
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry point (api_server.py / worker.py)
 logger = logging.getLogger(__name__)
 
+# Write content to a temporary Actfile instead of parsing it in memory
+USE_TEMPFILE = os.environ.get('ACT_USE_TEMPFILE', '').lower() in ('1', 'true', 'yes')
+
+# Shared pool for blocking workflow execution (asyncio's default is capped at cpu_count + 4)
+execution_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('ACT_WORKERS', (os.cpu_count() or 1) * 5)),
+    thread_name_prefix='act-exec'
+)
+
+# Run each BFS level's nodes one after another, in upstream order, instead of concurrently
+SEQUENTIAL_NODES = os.environ.get('ACT_SEQUENTIAL_NODES', '').lower() in ('1', 'true', 'yes')
+
+# Cap on workflows executing at once on a single event loop
+MAX_INFLIGHT = int(os.environ.get('ACT_MAX_INFLIGHT', 16))
+inflight_limits = weakref.WeakKeyDictionary()
+
+def get_inflight_limit() -> asyncio.Semaphore:
+    """Get the semaphore bounding in-flight workflows on the running loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in inflight_limits:
+        inflight_limits[loop] = asyncio.Semaphore(MAX_INFLIGHT)
+    return inflight_limits[loop]
+
+# Parsed Actfile data keyed by content hash, for re-runs of the same workflow
+PARSE_CACHE_SIZE = int(os.environ.get('ACT_PARSE_CACHE', 256))
+parse_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+parse_cache_lock = threading.Lock()
+# ${VAR} references, which the parser resolves from os.environ when parsing the env section
+ENV_REFERENCE = re.compile(r'\$\{([^}]+)\}')
+
+# Event loop for each calling thread, reused across executions
+thread_local = threading.local()
+
+def get_event_loop():
+    """Get or create event loop for current thread."""
+    if not hasattr(thread_local, 'loop'):
+        thread_local.loop = asyncio.new_event_loop()
+        thread_local.loop.set_default_executor(execution_pool)
+        asyncio.set_event_loop(thread_local.loop)
+    return thread_local.loop
+
+class ContentActfileParser(ActfileParser):
+    """Actfile parser that reads from an in-memory string instead of a path."""
+
+    def __init__(self, content: str):
+        super().__init__('<memory>')
+        self.content = content
+
+    def parse(self) -> Dict[str, Any]:
+        try:
+            sections = self._split_sections(self.content)
+
+            self.parsed_data = {
+                "parameters": self._parse_parameters(sections.get('parameters', '')),
+                "workflow": self._parse_section(sections.get('workflow', '')),
+                "nodes": self._parse_nodes(sections),
+                "edges": self._parse_edges(sections.get('edges', '')),
+                "dependencies": self._parse_dependencies(sections.get('dependencies', '')),
+                "env": self._parse_env(sections.get('env', '')),
+                "settings": self._parse_settings(sections.get('settings', ''))
+            }
+
+            self._replace_parameters()
+            self._validate_parsed_data()
+
+        except Exception as e:
+            raise ActfileParserError(f"Error parsing Actfile: {e}")
+
+        return self.parsed_data
+
+def parse_cache_key(content: str) -> str:
+    """Hash of the content plus the current value of every environment variable it references."""
+    digest = hashlib.sha256(content.encode('utf-8'))
+    for name in sorted(set(ENV_REFERENCE.findall(content))):
+        digest.update(f"\0{name}={os.environ.get(name, '')}".encode('utf-8'))
+    return digest.hexdigest()
+
+def parse_content(content: str) -> Dict[str, Any]:
+    """Parse ACT content, reusing the result for recently seen content and environment."""
+    key = parse_cache_key(content)
+    with parse_cache_lock:
+        parsed = parse_cache.get(key)
+        if parsed is not None:
+            parse_cache.move_to_end(key)
+
+    if parsed is None:
+        parsed = ContentActfileParser(content).parse()
+        with parse_cache_lock:
+            parse_cache[key] = parsed
+            while len(parse_cache) > PARSE_CACHE_SIZE:
+                parse_cache.popitem(last=False)
+
+    # Each execution gets its own copy; node executors may modify their data
+    return copy.deepcopy(parsed)
+
+class ContentExecutionManager(ExecutionManager):
+    """ExecutionManager built directly from ACT content, without touching disk.
+
+    Importing ``act`` already fills the node registry once per process, so unlike
+    ``ExecutionManager.__init__`` this does not rescan and re-import every node
+    module for each workflow.
+    """
+
+    def __init__(self, content: str, sandbox_timeout: int = 600):
+        self.content = content
+        self.actfile_path = Path('<memory>')
+        self.node_results = {}
+        self.execution_queue = asyncio.Queue()
+        self.sandbox_timeout = sandbox_timeout
+        self.sandbox_start_time = None
+        self.load_workflow()
+        self.workflow_engine = WorkflowEngine()
+        self.node_loading_status = {}
+
+    @classmethod
+    def from_content(cls, content: str, sandbox_timeout: int = 600) -> 'ContentExecutionManager':
+        return cls(content, sandbox_timeout)
+
+    def load_workflow(self):
+        logger.debug("Loading workflow data from content")
+        parser = ContentActfileParser(self.content)
+        parser.parsed_data = parse_content(self.content)
+        self.workflow_data = parser.parsed_data
+        self.actfile_parser = parser
+
+        self.load_node_executors()
+
+    async def execute_workflow_async(self) -> Dict[str, Any]:
+        """Run the workflow breadth-first, executing each level's nodes concurrently.
+
+        Differences from ExecutionManager.execute_workflow_async:
+
+        - Siblings at the same depth run at the same time, so a node can't rely on
+          an earlier sibling's result already being in node_results. Set
+          ACT_SEQUENTIAL_NODES=1 to run them one after another in upstream order.
+        - A node reached from several parents at the same depth runs once, with
+          the input of the last of those parents, instead of once per parent.
+        """
+        logger.debug("Starting async execution of workflow")
+        self.node_results = {}
+        self.sandbox_start_time = datetime.now()
+
+        try:
+            start_node_name = self.actfile_parser.get_start_node()
+            if not start_node_name:
+                logger.error("No start node specified in Actfile.")
+                return {"status": "error", "message": "No start node specified in Actfile.", "results": {}}
+
+            level = [(start_node_name, None)]
+            while level:
+                if self.is_sandbox_expired():
+                    logger.warning("Sandbox has expired. Stopping execution.")
+                    self._print_node_execution_results()
+                    return {
+                        "status": "warning",
+                        "message": "Workflow execution stopped due to sandbox expiration",
+                        "results": self.node_results
+                    }
+
+                if SEQUENTIAL_NODES:
+                    level_results = [
+                        await asyncio.to_thread(self.execute_node, node_name, input_data)
+                        for node_name, input_data in level
+                    ]
+                else:
+                    level_results = await asyncio.gather(*(
+                        asyncio.to_thread(self.execute_node, node_name, input_data)
+                        for node_name, input_data in level
+                    ))
+                for (node_name, _), node_result in zip(level, level_results):
+                    self.node_results[node_name] = node_result
+
+                # Successor -> input from its last parent; dicts keep first-seen order
+                next_level = {}
+                for (node_name, _), node_result in zip(level, level_results):
+                    if node_result.get('status') == 'error':
+                        logger.error("Node %s execution failed. Stopping workflow.", node_name)
+                        self._print_node_execution_results()
+                        return {
+                            "status": "error",
+                            "message": f"Workflow execution failed at node {node_name}",
+                            "results": self.node_results
+                        }
+                    for successor in self.actfile_parser.get_node_successors(node_name):
+                        next_level[successor] = node_result
+                level = list(next_level.items())
+
+            logger.debug("Workflow execution completed")
+            self._print_node_execution_results()
+
+            return {
+                "status": "success",
+                "message": "Workflow executed successfully",
+                "results": self.node_results
+            }
+
+        except Exception as e:
+            logger.error("Error during workflow execution: %s", e, exc_info=True)
+            self._print_node_execution_results()
+            return {
+                "status": "error",
+                "message": f"Workflow execution failed: {str(e)}",
+                "results": self.node_results
+            }
+
 class ActContentExecutor:
     def __init__(self):
         self.executions = {}
 
     def execute(self, content: str) -> Dict[str, Any]:
         """Execute ACT workflow content."""
+        return get_event_loop().run_until_complete(self.execute_async(content))
+
+    async def execute_async(self, content: str) -> Dict[str, Any]:
+        """Execute ACT workflow content, waiting for a free slot if MAX_INFLIGHT are running."""
+        async with get_inflight_limit():
+            if USE_TEMPFILE:
+                return await self._execute_from_tempfile(content)
+            return await self._execute_from_content(content)
+
+    async def _execute_from_content(self, content: str) -> Dict[str, Any]:
         try:
-            # Create event loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Execute async workflow
-            return loop.run_until_complete(self._execute_async(content))
-        finally:
-            loop.close()
+            # Nodes run on the loop's default executor (execution_pool), a level at a time
+            execution_manager = ContentExecutionManager.from_content(content)
+            result = await execution_manager.execute_workflow_async()
+
+            logger.debug("Workflow execution completed successfully")
+            return {
+                "status": "success",
+                "result": result
+            }
+
+        except Exception as e:
+            logger.error("Error during workflow execution: %s", e)
+            return {
+                "status": "error",
+                "error": str(e)
+            }
 
-    async def _execute_async(self, content: str) -> Dict[str, Any]:
-        temp_file = None
+    async def _execute_from_tempfile(self, content: str) -> Dict[str, Any]:
+        """Legacy path: execute via a temporary Actfile (ACT_USE_TEMPFILE=1)."""
+        temp_file_path = None
         try:
             # Create temp file with ACT content
             with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.act') as temp_file:
                 temp_file.write(content)
                 temp_file_path = temp_file.name
-            
-            logger.info(f"Created temporary file: {temp_file_path}")
+
+            logger.debug("Created temporary file: %s", temp_file_path)
 
             # Run execution in a thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             execution_manager = ExecutionManager(temp_file_path)
-            
+
             result = await loop.run_in_executor(
-                None, 
+                execution_pool,
                 execution_manager.execute_workflow
             )
-            
-            logger.info("Workflow execution completed successfully")
+
+            logger.debug("Workflow execution completed successfully")
             return {
                 "status": "success",
                 "result": result
             }
-            
+
         except Exception as e:
-            logger.error(f"Error during workflow execution: {str(e)}")
+            logger.error("Error during workflow execution: %s", e)
             return {
                 "status": "error",
                 "error": str(e)
             }
-            
+
         finally:
             # Cleanup temp file
-            if temp_file and os.path.exists(temp_file_path):
+            if temp_file_path:
                 try:
                     os.unlink(temp_file_path)
-                    logger.info(f"Cleaned up temporary file: {temp_file_path}")
-                except Exception as e:
-                    logger.error(f"Error cleaning up temporary file: {str(e)}")
+                    logger.debug("Cleaned up temporary file: %s", temp_file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.error("Error cleaning up temporary file: %s", e)
 
     def cleanup(self):
         """Cleanup executor resources."""
-        pass  # Add any cleanup if needed
\ No newline at end of file
+        pass  # Add any cleanup if needed
+
+def init_process_logging(log_queue):
+    """Process-pool initializer: send this process's log records to the parent's queue."""
+    from logging.handlers import QueueHandler
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    # force: importing act already installed a stream handler on the root logger
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
+
+# Executor owned by this process when it serves as a process-pool worker
+process_executor = None
+
+def execute_in_process(content: str) -> Dict[str, Any]:
+    """Process-pool entry point: execute content on this process's own executor."""
+    global process_executor
+    if process_executor is None:
+        process_executor = ActContentExecutor()
+    return process_executor.execute(content)
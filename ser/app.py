@@ -5,9 +5,15 @@ from typing import Dict, Optional, Any
 from dataclasses import dataclass
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
+from json_provider import OrjsonProvider
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import urllib3
 import time
+import threading
+from queue import Queue, Empty
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -17,14 +23,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
-# Initialize Docker client
+# Connections kept open to the Docker daemon; docker-py defaults to 10, which
+# the manager's request threads queue behind under burst load
+DOCKER_POOL = int(os.environ.get('DOCKER_POOL', 64))
+
+# Initialize Docker client, shared by every request thread
 try:
-    docker_client = docker.from_env()
+    docker_client = docker.from_env(max_pool_size=DOCKER_POOL)
     logger.info("Docker client initialized successfully")
 except Exception as e:
-    logger.error(f"Failed to initialize Docker client: {e}")
+    logger.error("Failed to initialize Docker client: %s", e)
     docker_client = None
 
 @dataclass
@@ -35,78 +46,430 @@ class ContainerInfo:
     status: str = 'starting'
     start_time: float = 0.0
     last_health_check: float = 0.0
+    last_used: float = 0.0  # last start/resume, forwarded execution or successful health poll
     health_status: str = 'unknown'
     error: Optional[str] = None
+    paused_at: float = 0.0
+    container: Any = None  # cached docker Container, avoids a containers.get per request
 
-# Container tracking
+# Container tracking, shared between request threads and the pool thread
 containers: Dict[str, ContainerInfo] = {}
 active_ports: Dict[int, str] = {}  # port -> artifact_id mapping
+state_lock = threading.RLock()
+
+# Background stop/remove of evicted containers, off the request thread
+cleanup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='container-cleanup')
 
 # Base port range
 BASE_PORT = 5002
 MAX_PORT = 5050
+free_ports = deque(range(BASE_PORT, MAX_PORT + 1))  # ports not in active_ports
+
+# Fixed parts of every worker container's configuration
+WORKER_IMAGE = 'workflow-worker:latest'
+WORKER_NETWORK = 'workflow-net'
+WORKER_BINDS = ['/tmp:/tmp:rw']
+WORKER_RESTART_POLICY = {'Name': 'unless-stopped'}
+
+# Read the host port back from Docker after creating a container (troubleshooting only)
+VERIFY_PORT_MAPPING = os.environ.get('VERIFY_PORT_MAPPING', '').lower() in ('1', 'true', 'yes')
+
+# Warm pool of idle worker containers handed out by /container/start
+POOL_SIZE = int(os.environ.get('FLOW_POOL', 4))
+PAUSED_TTL = int(os.environ.get('PAUSED_TTL', 600))  # seconds a stopped (paused) container is kept
+# Seconds a running container may go unused before eviction, 0 disables it; never
+# shorter than PAUSED_TTL, so an active container outlives a paused one
+POOL_MAX_IDLE = int(os.environ.get('POOL_MAX_IDLE', 1800))
+if POOL_MAX_IDLE:
+    POOL_MAX_IDLE = max(POOL_MAX_IDLE, PAUSED_TTL)
+container_pool: Queue = Queue()  # (container, port) of idle pooled containers
+# Tracked containers beyond this evict the least recently used; capped at the ports
+# left over once the pool has its share, since every container holds one
+MAX_CONTAINERS = min(int(os.environ.get('MAX_CONTAINERS', 256)), MAX_PORT - BASE_PORT + 1 - POOL_SIZE)
+POOL_OWNER = 'pool'  # active_ports owner of ports held by pooled containers
+pooled_ports: Dict[str, int] = {}  # container_id -> port of pooled containers still alive and unassigned
+pool_wakeup = threading.Event()
+
+# Keep-alive connections to the worker containers, shared by all request threads
+worker_session = requests.Session()
+worker_session.mount('http://', HTTPAdapter(pool_connections=64, pool_maxsize=128, max_retries=0))
+WORKER_TIMEOUT = (0.5, 2)  # (connect, read) seconds
+
+# Fan-out of worker /health probes for the bulk health route
+probe_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='worker-probe')
+
+# Recent inspect_container results, so bursts of health/state polls share one call
+INSPECT_TTL = float(os.environ.get('INSPECT_TTL', 0.5))  # seconds
+inspect_cache: Dict[str, tuple[float, dict]] = {}  # container_id -> (fetched_at, data)
+inspect_cache_lock = threading.Lock()
+
+# Latest sample from each tracked container's streaming stats endpoint; a one-shot
+# stats call blocks for a full sampling interval (~1s) to compute CPU deltas
+latest_stats: Dict[str, dict] = {}  # container_id -> stats sample
+stats_streams: Dict[str, threading.Event] = {}  # container_id -> stop signal
+STATS_MAX_RETRIES = 5
+
+def docker_call(fn, *args, **kwargs):
+    """Call a Docker client method, retrying once if a pooled connection went stale (e.g. dockerd restarted)."""
+    try:
+        return fn(*args, **kwargs)
+    except (requests.exceptions.ConnectionError, urllib3.exceptions.ProtocolError) as e:
+        logger.warning("Docker connection error (%s), retrying once", e)
+        return fn(*args, **kwargs)
+
+def ensure_worker_image():
+    """Make sure the worker image is present locally, pulling it once if it is not."""
+    try:
+        docker_call(docker_client.api.inspect_image, WORKER_IMAGE)
+        logger.info("Worker image %s is available", WORKER_IMAGE)
+    except docker.errors.ImageNotFound:
+        logger.info("Worker image %s not found locally, pulling", WORKER_IMAGE)
+        try:
+            docker_client.images.pull(WORKER_IMAGE)
+        except docker.errors.APIError as e:
+            logger.error("Failed to pull worker image %s: %s", WORKER_IMAGE, e)
+    except docker.errors.APIError as e:
+        logger.error("Failed to inspect worker image %s: %s", WORKER_IMAGE, e)
+
+def reserve_port(owner: str) -> int:
+    """Claim the next port in free_ports for owner.
 
-def find_available_port() -> int:
-    """Find an available port within the range."""
-    for port in range(BASE_PORT, MAX_PORT + 1):
-        if port not in active_ports:
-            return port
-    raise RuntimeError("No available ports in the specified range")
+    Nothing here probes the host: the manager runs in its own network namespace
+    and can't see ports published by other containers. A port Docker reports
+    as already allocated is passed to requeue_port instead.
+    """
+    with state_lock:
+        if not free_ports:
+            raise RuntimeError("No available ports in the specified range")
+        port = free_ports.popleft()
+        active_ports[port] = owner
+        return port
 
-def create_docker_container(artifact_id: str, port: int) -> tuple[str, int]:
+def requeue_port(port: int, owner: str):
+    """Send a port Docker reported as taken to the back of free_ports, so it is tried last."""
+    with state_lock:
+        if active_ports.get(port) == owner:
+            del active_ports[port]
+            free_ports.append(port)
+
+def release_port(port: int, owner: Optional[str] = None):
+    """Return a port to the free set, unless it has since been claimed by someone other than owner."""
+    with state_lock:
+        if owner is not None and active_ports.get(port, owner) != owner:
+            return
+        active_ports.pop(port, None)
+        if BASE_PORT <= port <= MAX_PORT and port not in free_ports:
+            free_ports.appendleft(port)
+
+def create_docker_container(artifact_id: str, port: int) -> tuple[Any, int]:
     """Create and start a new Docker container."""
     container_name = f"workflow-{artifact_id}"
     
     try:
         # Check for and remove existing container with same name
         try:
-            old_container = docker_client.containers.get(container_name)
-            logger.info(f"Found existing container {container_name}, stopping it")
-            old_container.stop()
-            old_container.remove()
-            logger.info(f"Removed existing container: {container_name}")
+            docker_call(docker_client.api.remove_container, container_name, force=True)
+            logger.info("Removed existing container: %s", container_name)
         except docker.errors.NotFound:
             pass
+        except docker.errors.APIError as e:
+            logger.warning("Docker cleanup of %s failed: %s", container_name, e)
 
-        logger.info(f"Creating new container {container_name} on port {port}")
-        # Create container with dynamic port binding
-        container = docker_client.containers.run(
-            image="workflow-worker:latest",
+        logger.info("Creating new container %s on port %s", container_name, port)
+        # Create and start through the low-level API; containers.run adds a reload round trip
+        host_config = docker_client.api.create_host_config(
+            port_bindings={port: port},  # Explicitly bind to the same port number
+            binds=WORKER_BINDS,
+            restart_policy=WORKER_RESTART_POLICY,
+            network_mode=WORKER_NETWORK
+        )
+        # Not retried: create isn't idempotent, and a stale connection has already been
+        # retried away by the remove_container call above
+        created = docker_client.api.create_container(
+            image=WORKER_IMAGE,
             name=container_name,
             detach=True,
-            network="workflow-net",
             environment={
                 "PORT": str(port),
                 "ARTIFACT_ID": artifact_id,
             },
-            ports={f"{port}/tcp": port},  # Explicitly bind to the same port number
-            volumes={
-                "/tmp": {"bind": "/tmp", "mode": "rw"}
-            },
-            restart_policy={"Name": "unless-stopped"}
+            ports=[port],
+            host_config=host_config,
+            networking_config=docker_client.api.create_networking_config({
+                WORKER_NETWORK: docker_client.api.create_endpoint_config()
+            })
         )
+        docker_call(docker_client.api.start, created['Id'])
+        container = docker_client.containers.prepare_model({'Id': created['Id']})
 
-        # Get container info with error handling
-        container_info = docker_client.api.inspect_container(container.id)
-        port_mappings = container_info['NetworkSettings']['Ports']
-        
-        # More defensive port extraction
-        if f'{port}/tcp' in port_mappings and port_mappings[f'{port}/tcp']:
-            host_port = int(port_mappings[f'{port}/tcp'][0]['HostPort'])
-            logger.info(f"Container port {port} mapped to host port {host_port}")
-        else:
-            host_port = port  # Fallback to the original port if mapping not found
-            logger.warning(f"Could not find port mapping, using original port {port}")
+        # The port is bound explicitly, so the host port is known without an inspect
+        host_port = port
+        if VERIFY_PORT_MAPPING:
+            container_info = cached_inspect(container.id)
+            port_mappings = container_info['NetworkSettings']['Ports']
+
+            # More defensive port extraction
+            if f'{port}/tcp' in port_mappings and port_mappings[f'{port}/tcp']:
+                host_port = int(port_mappings[f'{port}/tcp'][0]['HostPort'])
+                logger.info("Container port %s mapped to host port %s", port, host_port)
+            else:
+                logger.warning("Could not find port mapping, using original port %s", port)
         
-        logger.info(f"Container created: {container_name} on port {host_port}")
-        return container.id, host_port
+        logger.info("Container created: %s on port %s", container_name, host_port)
+        return container, host_port
 
     except Exception as e:
-        logger.error(f"Error creating container: {e}")
-        # Log more details about the error
-        logger.error(f"Error details: {str(e)}")
+        logger.error("Error creating container: %s", e)
         raise
 
+def fill_container_pool():
+    """Create pooled containers until POOL_SIZE idle workers are waiting."""
+    while len(pooled_ports) < POOL_SIZE:
+        port = reserve_port(POOL_OWNER)
+        try:
+            container, host_port = create_docker_container(f"pool-{port}", port)
+        except docker.errors.APIError as e:
+            if 'port is already allocated' in str(e):
+                requeue_port(port, POOL_OWNER)
+            else:
+                release_port(port)
+            logger.error("Failed to create pooled container on port %s: %s", port, e)
+            return
+        except Exception as e:
+            release_port(port)
+            logger.error("Failed to create pooled container on port %s: %s", port, e)
+            return
+        with state_lock:
+            pooled_ports[container.id] = host_port
+        container_pool.put((container, host_port))
+        logger.info("Added container %s on port %s to pool", container.id, host_port)
+
+def take_pooled_container() -> Optional[tuple[Any, int]]:
+    """Take an idle container from the pool and schedule a refill.
+
+    Containers removed while pooled (see watch_container_events) are skipped.
+    """
+    try:
+        while True:
+            container, port = container_pool.get_nowait()
+            with state_lock:
+                if pooled_ports.pop(container.id, None) is not None:
+                    return container, port
+    except Empty:
+        return None
+    finally:
+        pool_wakeup.set()
+
+def assign_pooled_container(artifact_id: str, port: int):
+    """Tell a pooled worker, created as pool-<port>, which artifact it now serves."""
+    try:
+        worker_session.post(
+            f"http://localhost:{port}/assign",
+            json={'artifactId': artifact_id},
+            timeout=WORKER_TIMEOUT
+        ).raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.warning("Could not assign pooled worker on port %s to artifact %s: %s", port, artifact_id, e)
+
+def get_container(container_info: ContainerInfo):
+    """Return the tracked Container object, fetching it from Docker only if not cached."""
+    if container_info.container is None:
+        container_info.container = docker_call(docker_client.containers.get, container_info.container_id)
+    return container_info.container
+
+def cached_inspect(container_id: str, ttl: float = INSPECT_TTL) -> dict:
+    """Inspect a container, reusing a result fetched less than ttl seconds ago."""
+    now = time.monotonic()
+    with inspect_cache_lock:
+        entry = inspect_cache.get(container_id)
+    if entry and now - entry[0] < ttl:
+        return entry[1]
+
+    data = docker_call(docker_client.api.inspect_container, container_id)
+    with inspect_cache_lock:
+        inspect_cache[container_id] = (now, data)
+    return data
+
+def invalidate_inspect(container_id: str):
+    """Drop a cached inspect result after the container's state changes."""
+    with inspect_cache_lock:
+        inspect_cache.pop(container_id, None)
+
+def stream_stats(container_id: str, stop_event: threading.Event):
+    """Keep latest_stats current for one container until it is stopped or removed."""
+    retries = 0
+    while not stop_event.is_set() and retries <= STATS_MAX_RETRIES:
+        try:
+            for sample in docker_client.api.stats(container_id, stream=True, decode=True):
+                if stop_event.is_set():
+                    break
+                latest_stats[container_id] = sample
+                retries = 0
+            else:
+                break  # stream closed by the daemon, e.g. the container exited
+        except docker.errors.NotFound:
+            break
+        except (docker.errors.APIError, requests.exceptions.RequestException) as e:
+            retries += 1
+            logger.warning("Stats stream for %s failed (%s), reconnecting", container_id, e)
+            stop_event.wait(min(2 ** retries, 30))
+    with state_lock:
+        if stats_streams.get(container_id) is stop_event:
+            stats_streams.pop(container_id, None)
+            latest_stats.pop(container_id, None)
+
+def start_stats_stream(container_id: str):
+    """Start a background stats streamer for a container if none is running."""
+    with state_lock:
+        if container_id in stats_streams:
+            return
+        stop_event = stats_streams[container_id] = threading.Event()
+    threading.Thread(
+        target=stream_stats,
+        args=(container_id, stop_event),
+        name=f"stats-{container_id[:12]}",
+        daemon=True
+    ).start()
+
+def stop_stats_stream(container_id: str):
+    """Signal a container's stats streamer to exit."""
+    with state_lock:
+        stop_event = stats_streams.pop(container_id, None)
+        latest_stats.pop(container_id, None)
+    if stop_event:
+        stop_event.set()
+
+def untrack_container(artifact_id: str, container_info: ContainerInfo):
+    """Stop tracking a container, unless another thread already replaced or removed it."""
+    with state_lock:
+        if containers.get(artifact_id) is container_info:
+            del containers[artifact_id]
+        release_port(container_info.port, owner=artifact_id)
+
+def evict_container(artifact_id: str, container_info: ContainerInfo):
+    """Stop and remove a tracked container and release its port."""
+    try:
+        container = get_container(container_info)
+        docker_call(container.stop, timeout=10)
+        docker_call(container.remove, force=True)
+    except docker.errors.NotFound:
+        pass
+    except docker.errors.APIError as e:
+        logger.warning("Error evicting container %s: %s", container_info.container_id, e)
+    invalidate_inspect(container_info.container_id)
+    stop_stats_stream(container_info.container_id)
+    untrack_container(artifact_id, container_info)
+
+def register_container(artifact_id: str, container, port: int):
+    """Track a running container, evicting the least recently used beyond MAX_CONTAINERS."""
+    now = time.time()
+    with state_lock:
+        containers[artifact_id] = ContainerInfo(
+            artifact_id=artifact_id,
+            container_id=container.id,
+            port=port,
+            status='running',
+            start_time=now,
+            last_used=now,
+            container=container
+        )
+        active_ports[port] = artifact_id
+        if port in free_ports:
+            free_ports.remove(port)
+        start_stats_stream(container.id)
+
+        overflow = len(containers) - MAX_CONTAINERS
+        if overflow <= 0:
+            return
+        victims = least_recently_used(overflow, exclude=artifact_id)
+        # Stop handing them out now; their ports are released once they are removed
+        for info in victims:
+            containers.pop(info.artifact_id, None)
+
+    for info in victims:
+        logger.info("Evicting least recently used container %s for artifact %s", info.container_id, info.artifact_id)
+        cleanup_executor.submit(evict_container, info.artifact_id, info)
+
+def least_recently_used(count: int, exclude: Optional[str] = None) -> list:
+    """The count tracked containers unused the longest, other than exclude's."""
+    with state_lock:
+        return sorted(
+            (info for info in containers.values() if info.artifact_id != exclude),
+            key=lambda info: info.last_used
+        )[:count]
+
+def make_room_for_port(artifact_id: str):
+    """Evict the least recently used container when every port in the range is taken."""
+    with state_lock:
+        if free_ports:
+            return
+        victims = least_recently_used(1, exclude=artifact_id)
+    for info in victims:
+        logger.info("Out of ports, evicting least recently used container %s for artifact %s",
+                    info.container_id, info.artifact_id)
+        evict_container(info.artifact_id, info)
+
+def evict_idle_containers():
+    """Evict containers paused for PAUSED_TTL or unused for POOL_MAX_IDLE seconds.
+
+    Starts, resumes, executions and health polls all count as use. A running
+    worker that still reports pending executions is kept regardless.
+    """
+    now = time.time()
+    for artifact_id, container_info in list(containers.items()):
+        if container_info.status == 'paused':
+            expired = PAUSED_TTL and now - container_info.paused_at > PAUSED_TTL
+        else:
+            expired = POOL_MAX_IDLE and now - container_info.last_used > POOL_MAX_IDLE
+            if expired:
+                worker_health, _, error_msg = probe_worker(container_info)
+                if error_msg is None and worker_health.get('executions', {}).get('pending'):
+                    logger.debug("Keeping idle container %s for artifact %s: executions pending",
+                                 container_info.container_id, artifact_id)
+                    container_info.last_used = now
+                    expired = False
+        if expired:
+            logger.info("Evicting idle container %s for artifact %s", container_info.container_id, artifact_id)
+            evict_container(artifact_id, container_info)
+
+def maintain_container_pool():
+    """Background loop that refills the pool and evicts idle containers."""
+    while True:
+        try:
+            fill_container_pool()
+            evict_idle_containers()
+        except Exception as e:
+            logger.error("Container pool maintenance failed: %s", e)
+        pool_wakeup.wait(timeout=30)
+        pool_wakeup.clear()
+
+def watch_container_events():
+    """Reclaim tracking and ports as soon as Docker reports a tracked or pooled container destroyed."""
+    while True:
+        try:
+            for event in docker_client.events(decode=True, filters={'type': 'container', 'event': ['die', 'destroy']}):
+                container_id = event.get('id')
+                invalidate_inspect(container_id)
+                if (event.get('Action') or event.get('status')) != 'destroy':
+                    continue
+                stop_stats_stream(container_id)
+                with state_lock:
+                    destroyed = [(artifact_id, container_info) for artifact_id, container_info in containers.items()
+                                 if container_info.container_id == container_id]
+                    pooled_port = pooled_ports.pop(container_id, None)
+                for artifact_id, container_info in destroyed:
+                    logger.info("Container %s for artifact %s was removed, releasing port %s",
+                                container_id, artifact_id, container_info.port)
+                    untrack_container(artifact_id, container_info)
+                if pooled_port is not None:
+                    # Its stale container_pool entry is skipped by take_pooled_container
+                    logger.info("Pooled container %s was removed, releasing port %s", container_id, pooled_port)
+                    release_port(pooled_port, owner=POOL_OWNER)
+                    pool_wakeup.set()
+        except Exception as e:
+            logger.error("Docker event stream failed: %s", e)
+        time.sleep(1)  # stream ended or failed; reconnect
+
 @app.route('/health')
 def health_check():
     """Health check endpoint for the manager service."""
@@ -117,24 +480,25 @@ def health_check():
                 'error': 'Docker client not initialized'
             }), 500
             
-        # Check Docker service
+        # Check Docker service; /_ping is enough, the info payload was never used
         try:
-            docker_info = docker_client.info()
+            docker_call(docker_client.ping)
             docker_status = 'healthy'
         except Exception as docker_error:
             docker_status = 'error'
-            logger.error(f"Docker health check failed: {docker_error}")
+            logger.error("Docker health check failed: %s", docker_error)
         
         return jsonify({
             'status': 'healthy',
             'service': 'workflow-manager',
             'docker_status': docker_status,
             'containers': len(containers),
+            'pooled_containers': len(pooled_ports),
             'active_ports': len(active_ports),
             'timestamp': time.time()
         })
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         return jsonify({
             'status': 'error',
             'error': str(e)
@@ -158,66 +522,97 @@ def start_container():
             }), 400
         
         artifact_id = data['artifactId']
-        logger.info(f"Requested container start for artifact: {artifact_id}")
+        logger.info("Requested container start for artifact: %s", artifact_id)
         
         # If container already exists and is running, return it
-        if artifact_id in containers:
-            existing_container = containers[artifact_id]
+        existing_container = containers.get(artifact_id)
+        if existing_container is not None:
             try:
                 # Verify container is actually running
-                container = docker_client.containers.get(existing_container.container_id)
+                container = get_container(existing_container)
+                docker_call(container.reload)
+                if container.status == 'paused':
+                    # Resume a container paused by /container/stop
+                    docker_call(container.unpause)
+                    invalidate_inspect(existing_container.container_id)
+                    existing_container.status = 'running'
+                    existing_container.paused_at = 0.0
+                    existing_container.start_time = existing_container.last_used = time.time()
+                    logger.info("Resumed paused container for artifact %s", artifact_id)
+                    return jsonify({
+                        'status': 'success',
+                        'message': 'Container resumed',
+                        'containerId': existing_container.container_id,
+                        'port': existing_container.port
+                    })
                 if container.status == 'running':
-                    logger.info(f"Container for artifact {artifact_id} is already running")
+                    existing_container.last_used = time.time()
+                    logger.info("Container for artifact %s is already running", artifact_id)
                     return jsonify({
                         'status': 'success',
                         'message': 'Container already running',
                         'containerId': existing_container.container_id,
                         'port': existing_container.port
                     })
+                # Exited, dead or stuck in created: remove it and release its port before replacing it
+                logger.info("Replacing %s container %s for artifact %s",
+                            container.status, existing_container.container_id, artifact_id)
+                evict_container(artifact_id, existing_container)
             except docker.errors.NotFound:
                 # Container doesn't exist anymore, remove from tracking
-                logger.warning(f"Tracked container {existing_container.container_id} not found in Docker, removing from tracking")
-                if existing_container.port in active_ports:
-                    del active_ports[existing_container.port]
-                del containers[artifact_id]
+                logger.warning("Tracked container %s not found in Docker, removing from tracking", existing_container.container_id)
+                untrack_container(artifact_id, existing_container)
                 
-        # Find next available port
-        port_search_attempts = 0
-        for port in range(BASE_PORT, BASE_PORT + 100):
-            port_search_attempts += 1
+        # Hand out a pre-warmed container if one is available
+        pooled = take_pooled_container()
+        if pooled:
+            container, host_port = pooled
+            register_container(artifact_id, container, host_port)
+            assign_pooled_container(artifact_id, host_port)
+
+            logger.info("Assigned pooled container %s to artifact %s on port %s", container.id, artifact_id, host_port)
+            return jsonify({
+                'status': 'success',
+                'containerId': container.id,
+                'port': host_port
+            })
+
+        # Claim a free port; a collision Docker itself reports is retried once on another port
+        for port_search_attempts in range(1, 3):
+            make_room_for_port(artifact_id)
+            port = reserve_port(artifact_id)
             try:
-                logger.info(f"Attempting to create container on port {port} (attempt {port_search_attempts})")
-                container_id, host_port = create_docker_container(artifact_id, port)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Attempting to create container on port %d (attempt %d)", port, port_search_attempts)
+                container, host_port = create_docker_container(artifact_id, port)
                 
                 # Register container and port
-                containers[artifact_id] = ContainerInfo(
-                    artifact_id=artifact_id,
-                    container_id=container_id,
-                    port=host_port,
-                    status='running',
-                    start_time=time.time()
-                )
-                active_ports[host_port] = artifact_id
+                register_container(artifact_id, container, host_port)
                 
-                logger.info(f"Successfully started container for artifact {artifact_id} on port {host_port}")
+                logger.info("Successfully started container for artifact %s on port %s", artifact_id, host_port)
                 return jsonify({
                     'status': 'success',
-                    'containerId': container_id,
+                    'containerId': container.id,
                     'port': host_port
                 })
                 
             except docker.errors.APIError as e:
                 if 'port is already allocated' in str(e):
-                    logger.warning(f"Port {port} is already allocated, trying next port")
+                    # Something outside the manager holds it
+                    logger.warning("Port %s is already allocated, trying next port", port)
+                    requeue_port(port, artifact_id)
                     continue
-                logger.error(f"Docker API error when creating container: {e}")
+                release_port(port)
+                logger.error("Docker API error when creating container: %s", e)
                 raise
-                
-        logger.error(f"Failed to find available port after {port_search_attempts} attempts")
-        raise RuntimeError(f"No available ports in range after {port_search_attempts} attempts")
+            except Exception:
+                release_port(port)
+                raise
+
+        raise RuntimeError(f"No available port after {port_search_attempts} attempts")
             
     except Exception as e:
-        logger.error(f"Error creating container: {e}")
+        logger.error("Error creating container: %s", e)
         return jsonify({
             'status': 'error',
             'error': str(e)
@@ -225,7 +620,7 @@ def start_container():
 
 @app.route('/container/stop', methods=['POST'])
 def stop_container():
-    """Stop and remove a Docker container."""
+    """Pause a Docker container, or stop and remove it when force is set."""
     try:
         if docker_client is None:
             return jsonify({
@@ -241,29 +636,46 @@ def stop_container():
             }), 400
         
         artifact_id = data['artifactId']
-        logger.info(f"Requested container stop for artifact: {artifact_id}")
+        logger.info("Requested container stop for artifact: %s", artifact_id)
         
-        if artifact_id not in containers:
-            logger.info(f"Container for artifact {artifact_id} not found or already stopped")
+        container_info = containers.get(artifact_id)
+        if container_info is None:
+            logger.info("Container for artifact %s not found or already stopped", artifact_id)
             return jsonify({
                 'status': 'success',
                 'message': 'Container not found or already stopped'
             })
         
-        container_info = containers[artifact_id]
+        force = data.get('force') in (True, 'true', '1')
         
         try:
+            container = get_container(container_info)
+
+            if not force:
+                # Keep the container in memory so the next start is an unpause
+                docker_call(container.reload)
+                if container.status == 'running':
+                    docker_call(container.pause)
+                    invalidate_inspect(container_info.container_id)
+                container_info.status = 'paused'
+                container_info.paused_at = time.time()
+                logger.info("Container %s paused", container_info.container_id)
+
+                return jsonify({
+                    'status': 'success',
+                    'message': 'Container paused'
+                })
+
             # Get and stop container
-            logger.info(f"Stopping container {container_info.container_id}")
-            container = docker_client.containers.get(container_info.container_id)
-            container.stop(timeout=10)
-            container.remove(force=True)
-            logger.info(f"Container {container_info.container_id} stopped and removed")
+            logger.info("Stopping container %s", container_info.container_id)
+            docker_call(container.stop, timeout=10)
+            docker_call(container.remove, force=True)
+            invalidate_inspect(container_info.container_id)
+            stop_stats_stream(container_info.container_id)
+            logger.info("Container %s stopped and removed", container_info.container_id)
             
             # Remove from tracking
-            if container_info.port in active_ports:
-                del active_ports[container_info.port]
-            del containers[artifact_id]
+            untrack_container(artifact_id, container_info)
             
             return jsonify({
                 'status': 'success',
@@ -272,10 +684,8 @@ def stop_container():
             
         except docker.errors.NotFound:
             # Container already removed
-            logger.warning(f"Container {container_info.container_id} not found, probably already removed")
-            if container_info.port in active_ports:
-                del active_ports[container_info.port]
-            del containers[artifact_id]
+            logger.warning("Container %s not found, probably already removed", container_info.container_id)
+            untrack_container(artifact_id, container_info)
             
             return jsonify({
                 'status': 'success',
@@ -283,7 +693,7 @@ def stop_container():
             })
             
     except Exception as e:
-        logger.error(f"Unexpected error in stop_container: {e}")
+        logger.error("Unexpected error in stop_container: %s", e)
         return jsonify({
             'status': 'error',
             'error': f"Unexpected error: {str(e)}"
@@ -307,36 +717,31 @@ def container_health():
             }), 400
         
         artifact_id = data['artifactId']
-        logger.debug(f"Checking health for container with artifact ID: {artifact_id}")
+        logger.debug("Checking health for container with artifact ID: %s", artifact_id)
         
-        if artifact_id not in containers:
+        container_info = containers.get(artifact_id)
+        if container_info is None:
             return jsonify({
                 'status': 'stopped',
                 'message': 'Container not found'
             })
         
-        container_info = containers[artifact_id]
         now = time.time()
         
         try:
-            # Check container existence first
+            # Get detailed container inspection data, which also confirms it still exists
             try:
-                container = docker_client.containers.get(container_info.container_id)
+                inspect_data = cached_inspect(container_info.container_id)
             except docker.errors.NotFound:
                 # Container not found in Docker
-                logger.warning(f"Container {container_info.container_id} not found in Docker")
-                if container_info.port in active_ports:
-                    del active_ports[container_info.port]
-                del containers[artifact_id]
+                logger.warning("Container %s not found in Docker", container_info.container_id)
+                untrack_container(artifact_id, container_info)
                 
                 return jsonify({
                     'status': 'stopped',
                     'message': 'Container not found in Docker'
                 })
             
-            # Get detailed container inspection data
-            inspect_data = docker_client.api.inspect_container(container_info.container_id)
-            
             # Extract container state
             container_state = {
                 'status': inspect_data['State']['Status'],
@@ -357,12 +762,20 @@ def container_health():
                     'log': inspect_data['State']['Health']['Log']
                 }
             
+            # Paused by /container/stop; reported as stopped so clients restart (unpause) it
+            if container_state['paused']:
+                return jsonify({
+                    'status': 'stopped',
+                    'message': 'Container is paused',
+                    'state': container_state
+                })
+
             # Check if container is actually running
             if not container_state['running']:
-                logger.warning(f"Container {container_info.container_id} is not running: {container_state['status']}")
-                containers[artifact_id].status = 'stopped'
-                containers[artifact_id].health_status = 'stopped'
-                containers[artifact_id].last_health_check = now
+                logger.warning("Container %s is not running: %s", container_info.container_id, container_state['status'])
+                container_info.status = 'stopped'
+                container_info.health_status = 'stopped'
+                container_info.last_health_check = now
                 
                 return jsonify({
                     'status': 'stopped',
@@ -372,22 +785,22 @@ def container_health():
             
             # Try to connect to the health endpoint 
             try:
-                logger.debug(f"Checking container health on port {container_info.port}")
-                health_response = requests.get(
+                logger.debug("Checking container health on port %s", container_info.port)
+                health_response = worker_session.get(
                     f"http://localhost:{container_info.port}/health",
-                    timeout=2
+                    timeout=WORKER_TIMEOUT
                 )
                 
                 if health_response.status_code == 200:
                     # Combine Docker state with worker health data
                     worker_health = health_response.json()
-                    logger.debug(f"Health check successful: {worker_health.get('status', 'unknown')}")
+                    logger.debug("Health check successful: %s", worker_health.get('status', 'unknown'))
                     
                     # Update container info
-                    containers[artifact_id].status = 'running'
-                    containers[artifact_id].health_status = worker_health.get('status', 'unknown')
-                    containers[artifact_id].last_health_check = now
-                    containers[artifact_id].error = None
+                    container_info.status = 'running'
+                    container_info.health_status = worker_health.get('status', 'unknown')
+                    container_info.last_health_check = container_info.last_used = now
+                    container_info.error = None
                     
                     return jsonify({
                         'status': 'running',
@@ -402,10 +815,10 @@ def container_health():
                     logger.warning(error_msg)
                     
                     # Update container info
-                    containers[artifact_id].status = 'error'
-                    containers[artifact_id].health_status = 'error'
-                    containers[artifact_id].last_health_check = now
-                    containers[artifact_id].error = error_msg
+                    container_info.status = 'error'
+                    container_info.health_status = 'error'
+                    container_info.last_health_check = now
+                    container_info.error = error_msg
                     
                     return jsonify({
                         'status': 'error',
@@ -421,10 +834,10 @@ def container_health():
                 logger.warning(error_msg)
                 
                 # Update container info
-                containers[artifact_id].status = 'error'
-                containers[artifact_id].health_status = 'unreachable'
-                containers[artifact_id].last_health_check = now
-                containers[artifact_id].error = error_msg
+                container_info.status = 'error'
+                container_info.health_status = 'unreachable'
+                container_info.last_health_check = now
+                container_info.error = error_msg
                 
                 return jsonify({
                     'status': 'error',
@@ -459,6 +872,138 @@ def container_health():
             'error': error_msg
         }), 500
 
+def probe_worker(container_info: ContainerInfo) -> tuple[Optional[dict], str, Optional[str]]:
+    """Fetch a worker's /health, returning (payload, health_status, error)."""
+    try:
+        health_response = worker_session.get(
+            f"http://localhost:{container_info.port}/health",
+            timeout=(WORKER_TIMEOUT[0], 1)
+        )
+        if health_response.status_code == 200:
+            worker_health = health_response.json()
+            return worker_health, worker_health.get('status', 'unknown'), None
+        return None, 'error', f"Worker health check failed with status {health_response.status_code}"
+    except requests.exceptions.RequestException as e:
+        return None, 'unreachable', f"Failed to connect to worker: {str(e)}"
+
+@app.route('/containers/health', methods=['POST'])
+def containers_health():
+    """Report the Docker state of several containers with a single list call."""
+    try:
+        if docker_client is None:
+            return jsonify({
+                'status': 'error',
+                'error': 'Docker client not initialized'
+            }), 500
+
+        data = request.json
+        if not data or not isinstance(data.get('artifactIds'), list):
+            return jsonify({
+                'status': 'error',
+                'error': 'Missing artifactIds'
+            }), 400
+
+        artifact_ids = data['artifactIds']
+        tracked = {}
+        for artifact_id in artifact_ids:
+            container_info = containers.get(artifact_id)
+            if container_info is not None:
+                tracked[artifact_id] = container_info
+
+        # One list call returns the state of every requested container
+        listed = {}
+        if tracked:
+            container_ids = [container_info.container_id for container_info in tracked.values()]
+            for entry in docker_call(docker_client.api.containers, all=True, filters={'id': container_ids}):
+                listed[entry['Id']] = entry
+
+        now = time.time()
+        results = {}
+        running = []
+        for artifact_id in artifact_ids:
+            container_info = tracked.get(artifact_id)
+            if container_info is None:
+                results[artifact_id] = {
+                    'status': 'stopped',
+                    'message': 'Container not found'
+                }
+                continue
+
+            entry = listed.get(container_info.container_id)
+            if entry is None:
+                logger.warning("Container %s not found in Docker", container_info.container_id)
+                untrack_container(artifact_id, container_info)
+                results[artifact_id] = {
+                    'status': 'stopped',
+                    'message': 'Container not found in Docker'
+                }
+                continue
+
+            container_state = {
+                'status': entry['State'],
+                'description': entry['Status']
+            }
+            if entry['State'] == 'running':
+                results[artifact_id] = {
+                    'status': 'running',
+                    'containerId': container_info.container_id,
+                    'port': container_info.port,
+                    'state': container_state
+                }
+                running.append((artifact_id, container_info))
+            elif entry['State'] == 'paused':
+                # Paused by /container/stop; reported as stopped so clients restart (unpause) it
+                results[artifact_id] = {
+                    'status': 'stopped',
+                    'message': 'Container is paused',
+                    'state': container_state
+                }
+            else:
+                container_info.status = 'stopped'
+                container_info.health_status = 'stopped'
+                container_info.last_health_check = now
+                results[artifact_id] = {
+                    'status': 'stopped',
+                    'message': f"Container is {entry['State']}",
+                    'state': container_state
+                }
+
+        # Probe the running workers in parallel over the shared keep-alive session
+        probes = probe_executor.map(probe_worker, [container_info for _, container_info in running])
+        for (artifact_id, container_info), (worker_health, health_status, error_msg) in zip(running, probes):
+            container_info.health_status = health_status
+            container_info.last_health_check = now
+            container_info.error = error_msg
+            if error_msg is None:
+                container_info.status = 'running'
+                container_info.last_used = now
+                results[artifact_id]['worker'] = worker_health
+            else:
+                container_info.status = 'error'
+                results[artifact_id]['status'] = 'error'
+                results[artifact_id]['error'] = error_msg
+
+        return jsonify({
+            'status': 'success',
+            'containers': results
+        })
+
+    except docker.errors.APIError as docker_error:
+        error_msg = f"Docker API error: {str(docker_error)}"
+        logger.error(error_msg)
+        return jsonify({
+            'status': 'error',
+            'error': error_msg
+        }), 500
+
+    except Exception as e:
+        error_msg = f"Unexpected error in containers_health: {str(e)}"
+        logger.error(error_msg)
+        return jsonify({
+            'status': 'error',
+            'error': error_msg
+        }), 500
+
 @app.route('/container/logs/<artifact_id>', methods=['GET'])
 def get_container_logs(artifact_id):
     """Get raw logs from a specific container without formatting."""
@@ -469,39 +1014,43 @@ def get_container_logs(artifact_id):
                 'error': 'Docker client not initialized'
             }), 500
             
-        if not artifact_id or artifact_id not in containers:
-            logger.warning(f"Logs requested for unknown container: {artifact_id}")
+        container_info = containers.get(artifact_id) if artifact_id else None
+        if container_info is None:
+            logger.warning("Logs requested for unknown container: %s", artifact_id)
             return jsonify({
                 'status': 'error',
                 'error': 'Container not found'
             }), 404
         
-        container_info = containers[artifact_id]
-        logger.info(f"Fetching logs for container {container_info.container_id}")
+        logger.debug("Fetching logs for container %s", container_info.container_id)
         
         try:
-            # Get container reference
-            container = docker_client.containers.get(container_info.container_id)
-            
-            # Use Docker SDK to get all available logs
-            logs = container.logs(
+            # Stream all available logs as Docker sends them instead of buffering the whole log
+            log_stream = docker_client.api.logs(
+                container_info.container_id,
                 stdout=True,
                 stderr=True,
                 timestamps=False,  # No timestamp prefixes
-                tail='all'         # Get all available logs
-            ).decode('utf-8', errors='replace')
-            
-            logger.info(f"Retrieved {len(logs)} bytes of logs from container {container_info.container_id}")
-            
+                tail='all',        # Get all available logs
+                stream=True,
+                follow=False
+            )
+
+            def relay():
+                try:
+                    yield from log_stream
+                finally:
+                    log_stream.close()
+
             # Return raw logs as plain text
-            response = Response(logs, mimetype='text/plain')
+            response = Response(relay(), mimetype='text/plain')
             response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
             response.headers['Pragma'] = 'no-cache'
             response.headers['Expires'] = '0'
             return response
                 
         except docker.errors.NotFound:
-            logger.warning(f"Container {container_info.container_id} not found when fetching logs")
+            logger.warning("Container %s not found when fetching logs", container_info.container_id)
             return jsonify({
                 'status': 'error',
                 'error': 'Container not found'
@@ -533,22 +1082,19 @@ def get_container_state(artifact_id):
                 'error': 'Docker client not initialized'
             }), 500
             
-        if not artifact_id or artifact_id not in containers:
-            logger.warning(f"State requested for unknown container: {artifact_id}")
+        container_info = containers.get(artifact_id) if artifact_id else None
+        if container_info is None:
+            logger.warning("State requested for unknown container: %s", artifact_id)
             return jsonify({
                 'status': 'error',
                 'error': 'Container not found'
             }), 404
         
-        container_info = containers[artifact_id]
-        logger.info(f"Fetching state for container {container_info.container_id}")
+        logger.debug("Fetching state for container %s", container_info.container_id)
         
         try:
-            # Get container reference
-            container = docker_client.containers.get(container_info.container_id)
-            
-            # Get detailed container inspection data
-            inspect_data = docker_client.api.inspect_container(container_info.container_id)
+            # Get detailed container inspection data, which also confirms it still exists
+            inspect_data = cached_inspect(container_info.container_id)
             
             # Extract key state information
             state_data = {
@@ -574,7 +1120,9 @@ def get_container_state(artifact_id):
             
             # Include recent logs (last 10 lines)
             try:
-                recent_logs = container.logs(
+                recent_logs = docker_call(
+                    docker_client.api.logs,
+                    container_info.container_id,
                     stdout=True,
                     stderr=True,
                     tail=10
@@ -582,16 +1130,16 @@ def get_container_state(artifact_id):
                 
                 state_data['recent_logs'] = recent_logs
             except Exception as log_error:
-                logger.warning(f"Failed to get recent logs: {log_error}")
+                logger.warning("Failed to get recent logs: %s", log_error)
                 state_data['log_error'] = str(log_error)
             
             # Add network settings
             if 'NetworkSettings' in inspect_data and 'Ports' in inspect_data['NetworkSettings']:
                 state_data['ports'] = inspect_data['NetworkSettings']['Ports']
             
-            # Add basic stats (CPU/memory)
+            # Add basic stats (CPU/memory) from the container's background stats stream
             try:
-                stats = container.stats(stream=False)
+                stats = latest_stats.get(container_info.container_id)
                 if stats:
                     state_data['stats'] = {
                         'cpu_percent': calculate_cpu_percent(stats),
@@ -599,13 +1147,14 @@ def get_container_state(artifact_id):
                         'memory_limit': stats['memory_stats'].get('limit', 0),
                     }
             except Exception as stats_error:
-                logger.warning(f"Failed to get container stats: {stats_error}")
+                logger.warning("Failed to get container stats: %s", stats_error)
                 state_data['stats_error'] = str(stats_error)
             
             # Add tracked container info
             state_data['tracked_info'] = {
                 'last_health_check': container_info.last_health_check,
                 'start_time': container_info.start_time,
+                'last_used': container_info.last_used,
                 'health_status': container_info.health_status,
                 'status': container_info.status,
                 'error': container_info.error
@@ -614,7 +1163,7 @@ def get_container_state(artifact_id):
             return jsonify(state_data)
                 
         except docker.errors.NotFound:
-            logger.warning(f"Container {container_info.container_id} not found when fetching state")
+            logger.warning("Container %s not found when fetching state", container_info.container_id)
             return jsonify({
                 'status': 'stopped',
                 'error': 'Container not found in Docker'
@@ -648,7 +1197,7 @@ def calculate_cpu_percent(stats):
             return (cpu_delta / system_delta) * cpu_count * 100
         return 0
     except (KeyError, TypeError, ZeroDivisionError) as e:
-        logger.warning(f"Error calculating CPU percent: {e}")
+        logger.warning("Error calculating CPU percent: %s", e)
         return 0
 
 @app.route('/container/execute', methods=['POST'])
@@ -661,64 +1210,76 @@ def container_execute():
                 'error': 'Docker client not initialized'
             }), 500
             
-        data = request.json
-        if not data or 'artifactId' not in data or 'content' not in data:
-            return jsonify({
-                'status': 'error',
-                'error': 'Missing artifactId or content'
-            }), 400
-        
-        artifact_id = data['artifactId']
-        logger.info(f"Requested workflow execution for artifact: {artifact_id}")
+        # The body is forwarded to the worker as-is; with the artifact ID in the query string
+        # or X-Artifact-Id header it is not parsed here at all
+        artifact_id = request.args.get('artifactId') or request.headers.get('X-Artifact-Id')
+        if not artifact_id:
+            data = request.get_json(silent=True)
+            if not data or 'artifactId' not in data or 'content' not in data:
+                return jsonify({
+                    'status': 'error',
+                    'error': 'Missing artifactId or content'
+                }), 400
+            artifact_id = data['artifactId']
+        body = request.get_data()
+
+        logger.debug("Requested workflow execution for artifact: %s", artifact_id)
         
         # Get container info
         container_info = containers.get(artifact_id)
         if not container_info:
-            logger.warning(f"Container for artifact {artifact_id} not found")
+            logger.warning("Container for artifact %s not found", artifact_id)
             return jsonify({
                 'status': 'error',
                 'error': 'Container not found'
             }), 404
             
         if container_info.status != 'running':
-            logger.warning(f"Container for artifact {artifact_id} is not running: {container_info.status}")
+            logger.warning("Container for artifact %s is not running: %s", artifact_id, container_info.status)
             return jsonify({
                 'status': 'error',
                 'error': f'Container is not running: {container_info.status}'
             }), 400
 
+        container_info.last_used = time.time()
+
         try:
-            # Check container health first
-            try:
-                health_response = requests.get(
-                    f"http://localhost:{container_info.port}/health",
-                    timeout=1
-                )
-                
-                if not health_response.ok:
-                    logger.warning(f"Container health check failed before execution: {health_response.status_code}")
-            except Exception as health_error:
-                logger.warning(f"Failed to check container health before execution: {health_error}")
-                
-            # Forward execution request to worker container
-            logger.info(f"Forwarding execution request to container on port {container_info.port}")
-            response = requests.post(
+            # Forward execution request to worker container; failures surface from the request itself
+            logger.debug("Forwarding execution request to container on port %s", container_info.port)
+            response = worker_session.post(
                 f"http://localhost:{container_info.port}/execute",
-                json={'content': data['content']},
-                timeout=5
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                timeout=(WORKER_TIMEOUT[0], 5),
+                stream=True
             )
             
             if response.ok:
-                result = response.json()
-                logger.info(f"Execution request accepted: {result.get('execution_id', 'unknown')}")
-                return result
+                # Relay the worker's reply as it arrives instead of buffering and re-encoding it
+                logger.debug("Execution request accepted by container on port %s", container_info.port)
+
+                def relay():
+                    try:
+                        yield from response.iter_content(chunk_size=8192)
+                    finally:
+                        response.close()
+
+                return Response(
+                    relay(),
+                    status=response.status_code,
+                    content_type=response.headers.get('Content-Type', 'application/json')
+                )
             else:
                 error_msg = f'Worker error: {response.text}'
-                logger.error(f"Execution request failed: {error_msg}")
+                logger.error("Execution request failed: %s", error_msg)
+                # Pass on the worker's backoff hint when its queue is full (429)
+                headers = {}
+                if 'Retry-After' in response.headers:
+                    headers['Retry-After'] = response.headers['Retry-After']
                 return jsonify({
                     'status': 'error',
                     'error': error_msg
-                }), response.status_code
+                }), response.status_code, headers
                 
         except requests.exceptions.RequestException as e:
             error_msg = f'Failed to execute workflow: {str(e)}'
@@ -736,6 +1297,20 @@ def container_execute():
             'error': error_msg
         }), 500
 
+def stop_and_remove(container_id: str):
+    """Stop and remove a single container, logging any failure."""
+    try:
+        logger.info("Stopping container %s", container_id)
+        docker_call(docker_client.api.stop, container_id, timeout=10)
+        docker_call(docker_client.api.remove_container, container_id, force=True)
+        invalidate_inspect(container_id)
+        stop_stats_stream(container_id)
+        logger.info("Successfully stopped container %s", container_id)
+    except docker.errors.NotFound:
+        logger.info("Container %s already removed", container_id)
+    except docker.errors.APIError as e:
+        logger.warning("Docker cleanup of %s failed: %s", container_id, e)
+
 def cleanup_on_shutdown():
     """Clean up all containers on server shutdown."""
     if docker_client is None:
@@ -743,22 +1318,39 @@ def cleanup_on_shutdown():
         return
         
     logger.info("Cleaning up containers before shutdown")
-    for artifact_id, container_info in list(containers.items()):
+    container_ids = [container_info.container_id for container_info in list(containers.values())]
+    while True:
         try:
-            logger.info(f"Stopping container {container_info.container_id}")
-            container = docker_client.containers.get(container_info.container_id)
-            container.stop(timeout=10)
-            container.remove(force=True)
-            logger.info(f"Successfully stopped container {container_info.container_id}")
-        except Exception as e:
-            logger.error(f"Error cleaning up container {container_info.container_id}: {e}")
+            container_ids.append(container_pool.get_nowait()[0].id)
+        except Empty:
+            break
+
+    # Stop containers concurrently; each stop may wait up to its 10s timeout. Plain threads,
+    # since executors refuse new work once the interpreter has started shutting down.
+    threads = [threading.Thread(target=stop_and_remove, args=(container_id,)) for container_id in container_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
     logger.info("Container cleanup completed")
 
 # Register cleanup handler
 import atexit
 atexit.register(cleanup_on_shutdown)
 
+# Have the worker image ready before the first container is created
+if docker_client is not None:
+    ensure_worker_image()
+
+# Release ports of containers removed outside the manager as soon as Docker reports it
+if docker_client is not None:
+    threading.Thread(target=watch_container_events, name='docker-events', daemon=True).start()
+
+# Start warm pool maintenance
+if docker_client is not None and (POOL_SIZE > 0 or POOL_MAX_IDLE or PAUSED_TTL):
+    threading.Thread(target=maintain_container_pool, name='container-pool', daemon=True).start()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
-    logger.info(f"Starting workflow manager on port {port}")
+    logger.info("Starting workflow manager on port %s", port)
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
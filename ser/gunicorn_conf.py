@@ -0,0 +1,15 @@
+import os
+
+# Gunicorn settings for the workflow manager (app.py)
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# Container tracking and the warm pool live in process memory, so run a single
+# worker process and get concurrency from its threads.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('MANAGER_THREADS', 32))
+
+# Container start/stop can wait on Docker for a while
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,20 @@
+import os
+
+# Gunicorn settings for the workflow worker (worker.py)
+bind = f"0.0.0.0:{os.environ.get('PORT', 5002)}"
+
+# The execution queue, its consumer threads and execution status live in process
+# memory, so run a single worker process and serve requests from its threads.
+# Don't preload: post_worker_init starts the queue threads in the worker process.
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('WORKER_THREADS', 16))
+
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+def post_worker_init(worker):
+    """Start the worker's background threads in the worker process, once worker.py is loaded."""
+    from worker import start_worker
+    start_worker()
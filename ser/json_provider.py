@@ -0,0 +1,30 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize jsonify() responses and parse request bodies with orjson.
+
+    Types orjson can't encode natively (datetimes, Decimal, objects with __html__, ...)
+    go through the conversions Flask's default provider applies, so dates stay
+    HTTP-dates. Anything orjson rejects outright, such as ints wider than 64 bits,
+    is encoded by the default provider instead.
+    """
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            body = super().dumps(obj) + '\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,105 +1,290 @@
 import os
-import json
 import time
 import logging
 import threading
-import subprocess
-import io
-from queue import Queue
-from dataclasses import dataclass
+import sys
+import gc
+import uuid
+import atexit
+import psutil
+import multiprocessing
+import orjson
 from typing import Dict, Any, Optional, List, Deque
-from collections import deque
+from collections import deque, OrderedDict
+from queue import Queue, Full
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-from act_executor import ActContentExecutor
+from json_provider import OrjsonProvider
+from act_executor import ActContentExecutor, execute_in_process, init_process_logging
+
+# Long-lived server: most cyclic objects live until shutdown, so collect gen-0 far less often
+gc.set_threshold(50_000, 20, 20)
 
 # Configure logging with custom handler to capture logs in memory
 class MemoryLogHandler(logging.Handler):
+    """Buffers (created, name, levelname, message) tuples; lines are formatted only when read."""
+
     def __init__(self, max_lines=2000):
         super().__init__()
         self.log_buffer = deque(maxlen=max_lines)
-        self.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
         
     def emit(self, record):
         try:
-            log_entry = self.format(record)
-            self.log_buffer.append(log_entry)
+            message = record.getMessage()
+            if record.exc_info:
+                message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+            self.log_buffer.append((record.created, record.name, record.levelname, message))
         except Exception:
             self.handleError(record)
+
+    @staticmethod
+    def format_entry(entry) -> str:
+        """Render a buffered entry like '%(asctime)s - %(name)s - %(levelname)s - %(message)s'."""
+        created, name, levelname, message = entry
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))
+        return f"{timestamp},{int(created * 1000) % 1000:03d} - {name} - {levelname} - {message}"
             
 memory_handler = MemoryLogHandler()
 
-# Configure logging
+# Logging threads only enqueue records; a listener thread writes them to stderr and
+# the memory buffer. The queue handler renders just the message (plus any traceback),
+# the stream handler adds the usual prefix.
+log_queue: 'Queue[logging.LogRecord]' = Queue(-1)
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, stream_handler, memory_handler, respect_handler_level=True)
+
+# Configure logging; force, since importing act already installs a root handler
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        memory_handler
-    ]
+    handlers=[queue_handler],
+    force=True
 )
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Attach log buffer to app for access in endpoint
 app.log_buffer = memory_handler.log_buffer
 
-# Store execution history for log access
-execution_history = {}
+# Store execution history for log access, oldest first
+execution_history: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+MAX_EXECUTION_HISTORY = 20
 app.execution_history = execution_history
 
 # Get environment variables
 PORT = int(os.environ.get('PORT', 5002))
 ARTIFACT_ID = os.environ.get('ARTIFACT_ID')
+# Docker sets HOSTNAME to the short container ID; fixed for the life of the process
+CONTAINER_ID = os.environ.get('HOSTNAME', '')
+PYTHON_VERSION = sys.version
+# Number of threads executing queued workflows at once
+WORKER_CONCURRENCY = int(os.environ.get('WORKER_CONCURRENCY', min(os.cpu_count() or 1, 8)))
+# Processes the executor threads hand workflows to, so CPU-bound runs aren't
+# serialized on the GIL; 0 runs workflows in the executor threads themselves.
+# Only WORKER_CONCURRENCY threads ever submit, so more processes would sit idle.
+EXECUTION_PROCESSES = int(os.environ.get('EXECUTION_PROCESSES', WORKER_CONCURRENCY))
 
-@dataclass
 class ExecutionInfo:
-    id: str
-    status: str
-    start_time: float
-    result: Optional[Dict[str, Any]] = None
-    error: Optional[str] = None
-    logs: List[Dict[str, Any]] = None
+    """State of one execution; slotted, since thousands may be tracked at once."""
+
+    __slots__ = ('id', 'status', 'start_time', 'result', 'error', 'logs')
+
+    def __init__(self, id: str, status: str, start_time: float,
+                 result: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None,
+                 logs: Optional[List[Dict[str, Any]]] = None):
+        self.id = id
+        self.status = status
+        self.start_time = start_time
+        self.result = result
+        self.error = error
+        self.logs = logs if logs is not None else []
+
+    def __repr__(self):
+        return f"ExecutionInfo(id={self.id!r}, status={self.status!r}, start_time={self.start_time!r})"
+
+# System metrics for /health, refreshed in the background so requests never wait on psutil
+HEALTH_SAMPLE_INTERVAL = 2.0  # seconds
+CONTAINER_START_TIME = os.path.getctime('/proc/1') if os.path.exists('/proc/1') else time.time()
+health_snapshot: Dict[str, Any] = {}
+
+class FastQueue:
+    """FIFO hand-off to the executor threads: a deque plus a single Condition.
+
+    queue.Queue takes its mutex and signals a condition on every put and get;
+    here a get only touches the lock when there is nothing to take. Puts never
+    block: past maxsize (0 = unbounded) they raise queue.Full.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._items: Deque[tuple] = deque()
+        self._not_empty = threading.Condition()
+
+    def put_nowait(self, item):
+        with self._not_empty:
+            if self.maxsize and len(self._items) >= self.maxsize:
+                raise Full
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def put_many_nowait(self, items):
+        """Enqueue a batch, waking one consumer per item; all or nothing."""
+        items = list(items)
+        with self._not_empty:
+            if self.maxsize and len(self._items) + len(items) > self.maxsize:
+                raise Full
+            self._items.extend(items)
+            self._not_empty.notify(len(items))
+
+    def get(self):
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                with self._not_empty:
+                    while not self._items:
+                        self._not_empty.wait()
 
-    def __post_init__(self):
-        if self.logs is None:
-            self.logs = []
+    def qsize(self) -> int:
+        return len(self._items)
+
+# Backpressure: /execute answers 429 once this many workflows are waiting to run,
+# or this many executions (including finished ones kept for /status) are tracked
+QUEUE_MAX = int(os.environ.get('QUEUE_MAX', 256))
+MAX_ACTIVE = int(os.environ.get('MAX_ACTIVE', 10000))
+RETRY_AFTER = '5'  # seconds
+# Largest request body /execute and /execute/bulk will read
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 16 * 1024 * 1024))
 
 # Execution tracking
 active_executions: Dict[str, ExecutionInfo] = {}
-execution_queue = Queue()
+execution_queue = FastQueue(maxsize=QUEUE_MAX)
 execution_lock = threading.Lock()
+# (finish_time, exec_id) of completed/failed executions, in the order they finished
+finished_executions: Deque[tuple] = deque()
+EXECUTION_RETENTION = 3600  # seconds a finished execution stays queryable
+# Tracked executions per status, kept current so /health never scans active_executions
+status_counts: Dict[str, int] = {'queued': 0, 'completed': 0, 'failed': 0}
+# Times of recent failures, oldest first
+recent_failures: Deque[float] = deque()
+RECENT_FAILURE_WINDOW = 600  # seconds
 
 # Initialize executor
 executor = ActContentExecutor()
+process_pool: Optional[ProcessPoolExecutor] = None
+process_pool_lock = threading.Lock()
+process_context = multiprocessing.get_context('spawn')
+
+# Log records from the pool processes, fed to the same stream and memory handlers;
+# created by start_worker
+process_log_queue = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the execution process pool, replacing it if a worker process died."""
+    global process_pool
+    with process_pool_lock:
+        if process_pool is None:
+            # spawn, not fork: this process already runs threads that may hold locks
+            process_pool = ProcessPoolExecutor(
+                max_workers=EXECUTION_PROCESSES,
+                mp_context=process_context,
+                initializer=init_process_logging,
+                initargs=(process_log_queue,)
+            )
+        return process_pool
+
+def run_execution(content: str) -> Dict[str, Any]:
+    """Execute workflow content, in the process pool when one is configured."""
+    if EXECUTION_PROCESSES <= 0:
+        return executor.execute(content)
+
+    pool = get_process_pool()
+    try:
+        return pool.submit(execute_in_process, content).result()
+    except BrokenProcessPool:
+        # A worker process died (e.g. OOM-killed); start a fresh pool for later executions
+        global process_pool
+        with process_pool_lock:
+            if process_pool is pool:
+                process_pool = None
+        pool.shutdown(wait=False)
+        raise
 
 def add_execution_log(exec_id, status, message):
     """Add log entry to execution history"""
-    if exec_id not in execution_history:
-        execution_history[exec_id] = []
-        
-    execution_history[exec_id].append({
-        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-        'status': status,
-        'message': message
-    })
+    with execution_lock:
+        if exec_id not in execution_history:
+            execution_history[exec_id] = []
+
+        execution_history[exec_id].append({
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': status,
+            'message': message
+        })
+
+def track_status(old_status, new_status):
+    """Move one execution between status_counts buckets; call with execution_lock held."""
+    if old_status:
+        status_counts[old_status] -= 1
+    if new_status:
+        status_counts[new_status] += 1
+
+def forget_executions(exec_ids):
+    """Drop executions that were registered but never made it onto the queue."""
+    with execution_lock:
+        for exec_id in exec_ids:
+            execution = active_executions.pop(exec_id, None)
+            if execution:
+                track_status(execution.status, None)
+            execution_history.pop(exec_id, None)
+
+def too_busy(error):
+    """429 response asking the client to retry later."""
+    return jsonify({
+        'status': 'error',
+        'error': error
+    }), 429, {'Retry-After': RETRY_AFTER}
+
+def read_json_body():
+    """Parse the request body with orjson, without keeping a cached copy on the request.
+
+    Returns (data, None), or (None, error_response) for oversized or malformed bodies.
+    """
+    if request.content_length and request.content_length > MAX_REQUEST_BYTES:
+        return None, (jsonify({
+            'status': 'error',
+            'error': f'Request body exceeds {MAX_REQUEST_BYTES} bytes'
+        }), 413)
+    try:
+        return orjson.loads(request.get_data(cache=False)), None
+    except orjson.JSONDecodeError as e:
+        return None, (jsonify({
+            'status': 'error',
+            'error': f'Invalid JSON body: {e}'
+        }), 400)
 
 def cleanup_old_executions():
-    """Clean up completed executions older than 1 hour."""
+    """Clean up executions that finished more than EXECUTION_RETENTION seconds ago."""
     current_time = time.time()
     with execution_lock:
-        for exec_id in list(active_executions.keys()):
-            execution = active_executions[exec_id]
-            if execution.status in ['completed', 'failed'] and \
-               (current_time - execution.start_time) > 3600:  # 1 hour
-                del active_executions[exec_id]
-                
-                # Keep execution history even after removing from active
-                if len(execution_history) > 20:  # Limit history to last 20 executions
-                    oldest_exec = sorted(execution_history.keys())[0]
-                    del execution_history[oldest_exec]
+        while finished_executions and current_time - finished_executions[0][0] > EXECUTION_RETENTION:
+            _, exec_id = finished_executions.popleft()
+            execution = active_executions.pop(exec_id, None)
+            if execution:
+                track_status(execution.status, None)
+
+        # Keep execution history even after removing from active, limited to the latest executions
+        while len(execution_history) > MAX_EXECUTION_HISTORY:
+            execution_history.popitem(last=False)
 
 def process_execution_queue():
     """Process queued executions."""
@@ -119,11 +304,13 @@ def process_execution_queue():
                 add_execution_log(exec_id, 'running', f"Starting execution with {len(content)} characters")
                 
                 # Execute workflow
-                result = executor.execute(content)
+                result = run_execution(content)
                 
                 with execution_lock:
+                    track_status(execution.status, 'completed')
                     execution.status = 'completed'
                     execution.result = result
+                    finished_executions.append((time.time(), exec_id))
                     
                 # Log completion
                 logger.info(f"Execution {exec_id} completed successfully")
@@ -134,50 +321,91 @@ def process_execution_queue():
                 add_execution_log(exec_id, 'failed', f"Execution failed: {str(e)}")
                 
                 with execution_lock:
+                    track_status(execution.status, 'failed')
                     execution.status = 'failed'
                     execution.error = str(e)
+                    finished_at = time.time()
+                    finished_executions.append((finished_at, exec_id))
+                    recent_failures.append(finished_at)
                     
         except Exception as e:
             logger.error(f"Error in queue processor: {e}")
             
         finally:
-            execution_queue.task_done()
             cleanup_old_executions()
 
-# Start queue processor thread
-queue_processor = threading.Thread(target=process_execution_queue, daemon=True)
-queue_processor.start()
+def sample_system_health():
+    """Take one snapshot of memory, CPU and disk usage."""
+    global health_snapshot
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    health_snapshot = {
+        'memory': {
+            'used_mb': round(memory.used / (1024 * 1024), 1),
+            'total_mb': round(memory.total / (1024 * 1024), 1),
+            'percent': memory.percent
+        },
+        'cpu': {
+            # Usage since the previous sample; never blocks
+            'percent': psutil.cpu_percent(interval=None)
+        },
+        'disk': {
+            'used_gb': round(disk.used / (1024 * 1024 * 1024), 1),
+            'total_gb': round(disk.total / (1024 * 1024 * 1024), 1),
+            'percent': disk.percent
+        }
+    }
+
+def refresh_system_health():
+    """Background loop keeping health_snapshot current."""
+    while True:
+        time.sleep(HEALTH_SAMPLE_INTERVAL)
+        try:
+            sample_system_health()
+        except Exception as e:
+            logger.error(f"Failed to sample system health: {e}")
+
+# Queue processor threads, all consuming from the same queue; started by start_worker
+queue_processors = []
 
 
 @app.route('/execute', methods=['POST'])
 def execute_workflow():
     """Execute ACT workflow."""
     try:
-        data = request.json
-        if not data or 'content' not in data:
+        data, error_response = read_json_body()
+        if error_response:
+            return error_response
+        if not isinstance(data, dict) or 'content' not in data:
             return jsonify({
                 'status': 'error',
                 'error': 'Missing workflow content'
             }), 400
 
         # Generate execution ID
-        import uuid
-        exec_id = str(uuid.uuid4())
+        exec_id = uuid.uuid4().hex
         
         # Register execution
         with execution_lock:
+            if len(active_executions) >= MAX_ACTIVE:
+                return too_busy('Too many tracked executions')
             active_executions[exec_id] = ExecutionInfo(
                 id=exec_id,
                 status='queued',
                 start_time=time.time()
             )
+            track_status(None, 'queued')
         
         # Log queuing
-        logger.info(f"Queued execution {exec_id}")
         add_execution_log(exec_id, 'queued', "Workflow queued for execution")
         
         # Add to execution queue
-        execution_queue.put((exec_id, data['content']))
+        try:
+            execution_queue.put_nowait((exec_id, data['content']))
+        except Full:
+            forget_executions([exec_id])
+            return too_busy('Execution queue is full')
+        logger.info(f"Queued execution {exec_id}")
         
         # Initial response
         return jsonify({
@@ -193,6 +421,88 @@ def execute_workflow():
             'error': f"Unexpected error: {str(e)}"
         }), 500
 
+@app.route('/execute/bulk', methods=['POST'])
+def execute_workflows_bulk():
+    """Queue several ACT workflows in one request."""
+    try:
+        data, error_response = read_json_body()
+        if error_response:
+            return error_response
+        workflows = data.get('workflows') if isinstance(data, dict) else None
+        if not isinstance(workflows, list) or not workflows:
+            return jsonify({
+                'status': 'error',
+                'error': 'Missing workflows'
+            }), 400
+
+        # Each entry is either the content itself or {"content": ...}
+        contents = [w.get('content') if isinstance(w, dict) else w for w in workflows]
+        if not all(isinstance(content, str) and content for content in contents):
+            return jsonify({
+                'status': 'error',
+                'error': 'Missing workflow content'
+            }), 400
+
+        pairs = [(uuid.uuid4().hex, content) for content in contents]
+        now = time.time()
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        # Register the whole batch under a single lock acquisition
+        with execution_lock:
+            if len(active_executions) + len(pairs) > MAX_ACTIVE:
+                return too_busy('Too many tracked executions')
+            for exec_id, _ in pairs:
+                active_executions[exec_id] = ExecutionInfo(
+                    id=exec_id,
+                    status='queued',
+                    start_time=now
+                )
+                track_status(None, 'queued')
+                execution_history[exec_id] = [{
+                    'timestamp': timestamp,
+                    'status': 'queued',
+                    'message': "Workflow queued for execution"
+                }]
+
+        try:
+            execution_queue.put_many_nowait(pairs)
+        except Full:
+            forget_executions([exec_id for exec_id, _ in pairs])
+            return too_busy('Execution queue is full')
+        logger.info(f"Queued {len(pairs)} executions")
+
+        return jsonify({
+            'status': 'accepted',
+            'execution_ids': [exec_id for exec_id, _ in pairs],
+            'message': f'{len(pairs)} workflows queued for execution'
+        })
+
+    except Exception as e:
+        logger.error(f"Unexpected error in execute_workflows_bulk: {e}")
+        return jsonify({
+            'status': 'error',
+            'error': f"Unexpected error: {str(e)}"
+        }), 500
+
+@app.route('/assign', methods=['POST'])
+def assign_artifact():
+    """Adopt the artifact ID a pooled worker was handed out for."""
+    global ARTIFACT_ID, health_cache
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data.get('artifactId'):
+        return jsonify({
+            'status': 'error',
+            'error': 'Missing artifactId'
+        }), 400
+
+    ARTIFACT_ID = data['artifactId']
+    health_cache = (0.0, '')
+    logger.info(f"Assigned to artifact {ARTIFACT_ID}")
+    return jsonify({
+        'status': 'success',
+        'artifact_id': ARTIFACT_ID
+    })
+
 @app.route('/status/<execution_id>')
 def execution_status(execution_id):
     """Get status of a specific execution."""
@@ -224,102 +534,128 @@ def execution_status(execution_id):
             'error': f"Failed to get status: {str(e)}"
         }), 500
 
+def tail_file(path: str, lines: int = 1000, chunk: int = 65536) -> bytes:
+    """Return up to the last `lines` lines within the final `chunk` bytes of a file.
+
+    Raises OSError if the file can't be opened or seeked (e.g. it is a pipe).
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(max(0, end - chunk))
+        data = f.read(end)
+    tail = data.splitlines(keepends=True)[-lines:]
+    return b''.join(tail)
+
+def logs_from_tail() -> Optional[Response]:
+    """End of the main process's stdout/stderr, when running in a container."""
+    if not CONTAINER_ID:
+        return None
+    try:
+        logs = tail_file('/proc/1/fd/1') + tail_file('/proc/1/fd/2')
+    except OSError as e:
+        logger.debug(f"Direct logs unavailable, using in-memory logs: {e}")
+        return None
+    return Response(logs, mimetype='text/plain') if logs else None
+
+def logs_from_memory() -> Optional[Response]:
+    """Records captured by the in-memory log handler."""
+    if not app.log_buffer:
+        return None
+    # Snapshot the entry references; the deque can't be iterated while handlers append
+    logs = list(app.log_buffer)
+
+    def stream_lines():
+        for entry in logs:
+            yield MemoryLogHandler.format_entry(entry) + "\n"
+
+    return Response(stream_lines(), mimetype='text/plain')
+
+def logs_from_history() -> Optional[Response]:
+    """Status history of recent executions."""
+    with execution_lock:
+        histories = [(exec_id, list(history)) for exec_id, history in app.execution_history.items()]
+    if not histories:
+        return None
+
+    def stream_history():
+        for exec_id, history in histories:
+            for entry in history:
+                yield f"{entry.get('timestamp', '')} - Execution {exec_id} - {entry.get('status', '')} - {entry.get('message', '')}\n"
+
+    return Response(stream_history(), mimetype='text/plain')
+
+def logs_sysinfo() -> Response:
+    """Basic system info, for when no logs are available yet."""
+    system_info = [
+        f"Container ID: {CONTAINER_ID or 'unknown'}",
+        f"Artifact ID: {ARTIFACT_ID or 'unknown'}",
+        f"Start time: {time.ctime(CONTAINER_START_TIME)}",
+        f"Current time: {time.ctime()}",
+        f"Python version: {PYTHON_VERSION}",
+        f"OS: {sys.platform}",
+        "No logs available. Container might be newly started."
+    ]
+    return Response("\n".join(system_info), mimetype='text/plain')
+
 @app.route('/logs', methods=['GET'])
 def get_logs():
-    """Return raw container logs with minimal formatting."""
-    try:
-        # Option 1: Get logs from Docker directly (most reliable)
-        try:
-            # Get the container ID from hostname
-            container_id = os.environ.get('HOSTNAME', '')
-            if container_id:
-                # Use subprocess to get raw container logs
-                result = subprocess.run(
-                    ['tail', '-n', '1000', '/proc/1/fd/1', '/proc/1/fd/2'], 
-                    capture_output=True, 
-                    text=True
-                )
-                return Response(result.stdout + result.stderr, mimetype='text/plain')
-        except Exception as e:
-            logger.error(f"Error getting direct logs: {e}")
-            
-        # Option 2: Get logs from memory buffer
-        if hasattr(app, 'log_buffer') and app.log_buffer:
-            logs = list(app.log_buffer)
-            return Response("\n".join(logs), mimetype='text/plain')
-            
-        # Option 3: Return execution history
-        if hasattr(app, 'execution_history') and app.execution_history:
-            logs = []
-            for exec_id, history in app.execution_history.items():
-                for entry in history:
-                    logs.append(f"{entry.get('timestamp', '')} - Execution {exec_id} - {entry.get('status', '')} - {entry.get('message', '')}")
-            return Response("\n".join(logs), mimetype='text/plain')
-
-        # Option 4: Return basic system info if nothing else is available
-        system_info = [
-            f"Container ID: {os.environ.get('HOSTNAME', 'unknown')}",
-            f"Artifact ID: {os.environ.get('ARTIFACT_ID', 'unknown')}",
-            f"Start time: {time.ctime(os.path.getctime('/proc/1'))}",
-            f"Current time: {time.ctime()}",
-            f"Python version: {sys.version}",
-            f"OS: {sys.platform}",
-            "No logs available. Container might be newly started."
-        ]
-        return Response("\n".join(system_info), mimetype='text/plain')
-            
-    except Exception as e:
-        error_message = f"Error retrieving logs: {str(e)}\n"
-        return Response(error_message, mimetype='text/plain')
+    """Return raw container logs with minimal formatting, from the first source that has any."""
+    return logs_from_tail() or logs_from_memory() or logs_from_history() or logs_sysinfo()
+
+@app.route('/debug/gc')
+def gc_stats():
+    """Garbage collector thresholds, pending counts and per-generation stats."""
+    return jsonify({
+        'thresholds': gc.get_threshold(),
+        'counts': gc.get_count(),
+        'frozen': gc.get_freeze_count(),
+        'stats': gc.get_stats()
+    })
     
+# Serialized /health body reused for HEALTH_CACHE_TTL seconds: (expires_at, body)
+HEALTH_CACHE_TTL = 1  # seconds
+health_cache = (0.0, '')
+
+def health_response(body: str) -> Response:
+    """Wrap a serialized /health body, letting clients and proxies reuse it briefly."""
+    return Response(body, mimetype='application/json',
+                    headers={'Cache-Control': f'max-age={HEALTH_CACHE_TTL}'})
+
 @app.route('/health')
 def health_check():
     """Enhanced health check endpoint with detailed worker status."""
+    global health_cache
     try:
-        # Get system metrics
-        import psutil
-        import os
-        import time
-        import sys
-        
+        now = time.monotonic()
+        expires_at, body = health_cache
+        if now < expires_at:
+            return health_response(body)
+
         # Calculate uptime
-        start_time = os.path.getctime('/proc/1')
-        uptime_seconds = time.time() - start_time
+        uptime_seconds = time.time() - CONTAINER_START_TIME
         hours, remainder = divmod(uptime_seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
         
-        # Get memory usage
-        memory = psutil.virtual_memory()
-        memory_used_mb = memory.used / (1024 * 1024)
-        memory_total_mb = memory.total / (1024 * 1024)
-        memory_percent = memory.percent
-        
-        # Get CPU usage
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        
-        # Get disk usage
-        disk = psutil.disk_usage('/')
-        disk_used_gb = disk.used / (1024 * 1024 * 1024)
-        disk_total_gb = disk.total / (1024 * 1024 * 1024)
-        disk_percent = disk.percent
+        # System metrics from the last background sample
+        system_health = health_snapshot
         
-        # Get execution stats
-        active_count = len(active_executions)
-        completed_count = sum(1 for exec_info in active_executions.values() 
-                             if exec_info.status in ['completed', 'failed'])
-        pending_count = active_count - completed_count
+        # Get execution stats from the running counters
+        with execution_lock:
+            active_count = len(active_executions)
+            completed_count = status_counts['completed'] + status_counts['failed']
+            pending_count = status_counts['queued']
+
+            # Check if any executions failed in the last 10 minutes
+            cutoff = time.time() - RECENT_FAILURE_WINDOW
+            while recent_failures and recent_failures[0] < cutoff:
+                recent_failures.popleft()
+            has_recent_failures = bool(recent_failures)
         queue_size = execution_queue.qsize()
         
-        # Check if any recent executions have failed
-        has_recent_failures = any(
-            exec_info.status == 'failed' and (time.time() - exec_info.start_time) < 600  # Last 10 minutes
-            for exec_info in active_executions.values()
-        )
-        
-        return jsonify({
+        body = app.json.dumps({
             'status': 'healthy',
             'service': f'workflow-worker-{ARTIFACT_ID}',
-            'container_id': os.environ.get('HOSTNAME', 'unknown'),
+            'container_id': CONTAINER_ID or 'unknown',
             'port': PORT,
             
             # Execution stats
@@ -339,29 +675,57 @@ def health_check():
                     'seconds': int(seconds),
                     'total_seconds': int(uptime_seconds)
                 },
-                'memory': {
-                    'used_mb': round(memory_used_mb, 1),
-                    'total_mb': round(memory_total_mb, 1),
-                    'percent': memory_percent
-                },
-                'cpu': {
-                    'percent': cpu_percent
-                },
-                'disk': {
-                    'used_gb': round(disk_used_gb, 1),
-                    'total_gb': round(disk_total_gb, 1),
-                    'percent': disk_percent
-                },
-                'python_version': sys.version
+                'memory': system_health['memory'],
+                'cpu': system_health['cpu'],
+                'disk': system_health['disk'],
+                'python_version': PYTHON_VERSION
             }
         })
+        health_cache = (now + HEALTH_CACHE_TTL, body)
+        return health_response(body)
     except Exception as e:
         logger.error(f"Health check error: {e}")
         return jsonify({
             'status': 'error',
             'error': str(e)
         }), 500
+
+worker_started = False
+
+def start_worker():
+    """Start the log listeners, health sampler and queue processors; call once per server process.
+
+    Nothing starts on import: under the spawn start method, process-pool children
+    may re-import this module and must not run a second worker.
+    """
+    global worker_started, process_log_queue
+    if worker_started:
+        return
+    worker_started = True
+
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    if EXECUTION_PROCESSES > 0:
+        process_log_queue = process_context.Queue(-1)
+        process_log_listener = QueueListener(process_log_queue, stream_handler, memory_handler,
+                                             respect_handler_level=True)
+        process_log_listener.start()
+        atexit.register(process_log_listener.stop)
+
+    sample_system_health()
+    threading.Thread(target=refresh_system_health, name='health-sampler', daemon=True).start()
+
+    for i in range(WORKER_CONCURRENCY):
+        queue_processor = threading.Thread(target=process_execution_queue, name=f"exec-{i}", daemon=True)
+        queue_processor.start()
+        queue_processors.append(queue_processor)
+
+    # Move everything allocated during startup (imports, app, node registry) out of the
+    # collected generations so later collections don't rescan it
+    gc.freeze()
+
 if __name__ == '__main__':
+    start_worker()
     logger.info(f"Starting worker on port {PORT}")
     logger.info(f"Artifact ID: {ARTIFACT_ID}")
     app.run(host='0.0.0.0', port=PORT)
\ No newline at end of file
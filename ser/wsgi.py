@@ -0,0 +1,4 @@
+"""WSGI entry point for the workflow manager: gunicorn -c gunicorn_conf.py wsgi:app"""
+from app import app
+
+__all__ = ['app']
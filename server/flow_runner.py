@@ -2,7 +2,8 @@ import os
 import sys
 import json
 import logging
-from typing import Dict, Any
+from collections import defaultdict, deque
+from typing import Dict, Any, List
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,17 +12,29 @@ class FlowRunner:
     def __init__(self, flow_content: Dict[str, Any]):
         self.flow_content = flow_content
         self.flow_id = flow_content.get('workflow', {}).get('workflow_id')
+        self.rebuild_index()
+        
+    def rebuild_index(self):
+        """Build the edge adjacency index; call again after mutating flow_content."""
+        self._adj: Dict[str, List[str]] = defaultdict(list)
+        self._indeg: Dict[str, int] = {node_id: 0 for node_id in self.flow_content.get('nodes', {})}
+        for edge in self.flow_content.get('edges', []):
+            source, target = edge['source'], edge['target']
+            # An unknown endpoint would otherwise surface later as a bogus cycle
+            for node_id in (source, target):
+                if node_id not in self._indeg:
+                    raise ValueError(f"Edge references unknown node: {node_id}")
+            self._adj[source].append(target)
+            self._indeg[target] += 1
         
     def execute(self):
         try:
             logger.info(f"Starting execution of flow {self.flow_id}")
             
-            # Get nodes and their connections
             nodes = self.flow_content.get('nodes', {})
-            edges = self.flow_content.get('edges', [])
             
             # Execute nodes in order based on edges
-            execution_order = self._determine_execution_order(nodes, edges)
+            execution_order = self._determine_execution_order()
             
             results = {}
             for node_id in execution_order:
@@ -42,28 +55,27 @@ class FlowRunner:
                 "error": str(e)
             }
     
-    def _determine_execution_order(self, nodes, edges):
-        # Implement topological sort based on edges
-        # This is a simplified version - you'd want more robust logic
-        visited = set()
-        order = []
-        
-        def visit(node_id):
-            if node_id in visited:
-                return
-            visited.add(node_id)
-            # Find children
-            children = [edge['target'] for edge in edges if edge['source'] == node_id]
-            for child in children:
-                visit(child)
-            order.append(node_id)
+    def _determine_execution_order(self):
+        # Topological sort (Kahn's algorithm) over the cached index; in_degree is
+        # a working copy so the index stays intact for later runs
+        adjacency = self._adj
+        in_degree = dict(self._indeg)
             
         # Start with nodes that have no incoming edges
-        start_nodes = set(nodes.keys()) - set(edge['target'] for edge in edges)
-        for node_id in start_nodes:
-            visit(node_id)
+        ready = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+        order = []
+        while ready:
+            node_id = ready.popleft()
+            order.append(node_id)
+            for child in adjacency.get(node_id, ()):
+                in_degree[child] -= 1
+                if in_degree[child] == 0:
+                    ready.append(child)
+                    
+        if len(order) != len(in_degree):
+            raise ValueError("Flow contains a cycle")
             
-        return list(reversed(order))
+        return order
     
     def _execute_node(self, node):
         # Implement node execution logic based on node type
@@ -79,12 +91,54 @@ class FlowRunner:
             "output": f"Executed {operation} with params {params}"
         }
 
+def load_flow_file(path: str) -> Dict[str, Any]:
+    """Load flow content from a file, e.g. on a tmpfs mount shared with the host."""
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+def run_flow(flow_content: Any) -> Dict[str, Any]:
+    """Run one flow, reporting malformed flow content as an error result."""
+    try:
+        if not isinstance(flow_content, dict):
+            raise TypeError(f"expected a JSON object, got {type(flow_content).__name__}")
+        # Indexing the edges rejects malformed ones before anything runs
+        runner = FlowRunner(flow_content)
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        return {"status": "error", "error": f"Invalid flow: {e}"}
+    return runner.execute()
+
+def serve_stdin():
+    """Run flows read as newline-delimited JSON from stdin, one JSON result per line."""
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            flow_content = json.loads(line)
+            # {"input_path": ...} points at a payload written to the shared tmpfs
+            if isinstance(flow_content, dict) and 'input_path' in flow_content:
+                flow_content = load_flow_file(flow_content['input_path'])
+        except (OSError, json.JSONDecodeError) as e:
+            result = {"status": "error", "error": f"Invalid flow input: {e}"}
+        else:
+            result = run_flow(flow_content)
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
 if __name__ == "__main__":
-    # Read flow content from environment variable or file
-    flow_content = json.loads(os.environ.get('FLOW_CONTENT', '{}'))
+    if '--daemon' in sys.argv:
+        # Long-lived mode: one interpreter serves many flows over stdin/stdout
+        serve_stdin()
+        sys.exit(0)
+
+    # Read flow content from a file (FLOW_INPUT) or environment variable
+    flow_input = os.environ.get('FLOW_INPUT')
+    if flow_input:
+        flow_content = load_flow_file(flow_input)
+    else:
+        flow_content = json.loads(os.environ.get('FLOW_CONTENT', '{}'))
     
-    runner = FlowRunner(flow_content)
-    result = runner.execute()
+    result = run_flow(flow_content)
     
     # Output results in a format that can be captured by the executor
     print(json.dumps(result))
\ No newline at end of file